@@ -1,54 +1,81 @@
 # --- Step 1: Import libraries ---
-import pandas as pd
+from column_plan import KEY_MEASURES, read_header, plan_columns, read_planned_csv
 
-# --- Step 2: Load both datasets ---
-crop_df = pd.read_csv("/content/cleaned_crop_data.csv", low_memory=False)
-land_df = pd.read_csv("/content/cleaned_land_data.csv", low_memory=False)
+CROP_PATH = "/content/cleaned_crop_data.csv"
+LAND_PATH = "/content/cleaned_land_data.csv"
 
-# --- Step 3: Function to clean column names ---
-def clean_columns(df):
+# --- Step 2: Function to clean column names ---
+def clean_column_name(col):
     """
-    Simplifies messy long column names like:
+    Simplifies a messy long column name like:
     'classification_of_land_in_each_district_of_state_ut_for_the_year_2018_2019__hectare__classification_of_reporting_area_forests_forests_4'
     into clean format like:
     '2018_2019_forests'
     """
-    new_cols = []
-    for col in df.columns:
-        # Extract year
-        year = ""
-        if "2015_2016" in col:
-            year = "2015_2016"
-        elif "2016_2017" in col:
-            year = "2016_2017"
-        elif "2017_2018" in col:
-            year = "2017_2018"
-        elif "2018_2019" in col:
-            year = "2018_2019"
-        elif "2019_2020" in col:
-            year = "2019_2020"
-        elif "2020_2021" in col:
-            year = "2020_2021"
-        elif "2021_2022" in col:
-            year = "2021_2022"
-        elif "2022_2023" in col:
-            year = "2022_2023"
-        elif "2023_2024" in col:
-            year = "2023_2024"
+    # Extract year
+    year = ""
+    if "2015_2016" in col:
+        year = "2015_2016"
+    elif "2016_2017" in col:
+        year = "2016_2017"
+    elif "2017_2018" in col:
+        year = "2017_2018"
+    elif "2018_2019" in col:
+        year = "2018_2019"
+    elif "2019_2020" in col:
+        year = "2019_2020"
+    elif "2020_2021" in col:
+        year = "2020_2021"
+    elif "2021_2022" in col:
+        year = "2021_2022"
+    elif "2022_2023" in col:
+        year = "2022_2023"
+    elif "2023_2024" in col:
+        year = "2023_2024"
+
+    # Extract key label (like forests, net_area_sown, fallow_land, etc.)
+    label = col.split("__")[-1].replace("_", " ").strip()
+    label = label.replace(" ", "_")
 
-        # Extract key label (like forests, net_area_sown, fallow_land, etc.)
-        label = col.split("__")[-1].replace("_", " ").strip()
-        label = label.replace(" ", "_")
+    # Combine year + label for clarity
+    return f"{year}_{label}" if year else label
 
-        # Combine year + label for clarity
-        new_name = f"{year}_{label}" if year else label
-        new_cols.append(new_name)
-    df.columns = new_cols
+def clean_columns(df):
+    """Applies clean_column_name to every column of df."""
+    df.columns = [clean_column_name(col) for col in df.columns]
     return df
 
-# --- Step 4: Clean column names ---
-crop_df = clean_columns(crop_df)
-land_df = clean_columns(land_df)
+# --- Step 3: Plan the reads from the headers only ---
+# Mirrors Steps 5-6 below: district columns are dropped, and when the file has
+# state + year only those plus the KEY_MEASURES columns survive. Anything else is
+# never parsed.
+def plan_key_columns(path, key_names=None):
+    """
+    Returns (usecols, dtype, key_names) for a raw file.
+    key_names: cleaned names to keep; if None they are resolved from this header.
+    """
+    raw_cols = read_header(path)
+    cleaned = {col: clean_column_name(col) for col in raw_cols}
+    kept = [col for col in raw_cols if "district" not in cleaned[col].lower()]
+    if key_names is None:
+        key_names = ["state", "year"] + [cleaned[col] for col in kept
+                                         if any(k in cleaned[col] for k in KEY_MEASURES)]
+    names = set(cleaned[col] for col in kept)
+    if all(k in names for k in ["state", "year"]):
+        keep = [col for col in kept if cleaned[col] in key_names]
+    else:
+        keep = kept
+    id_cols = [col for col in keep if cleaned[col] in ("state", "year")]
+    usecols, dtype = plan_columns(path, keep, id_columns=id_cols, header=raw_cols)
+    return usecols, dtype, key_names
+
+land_usecols, land_dtype, land_key_names = plan_key_columns(LAND_PATH)
+# Step 6 selects the crop columns by the land key columns, so plan crop with them
+crop_usecols, crop_dtype, _ = plan_key_columns(CROP_PATH, key_names=land_key_names)
+
+# --- Step 4: Load both datasets (pruned) and clean column names ---
+crop_df = clean_columns(read_planned_csv(CROP_PATH, crop_usecols, crop_dtype))
+land_df = clean_columns(read_planned_csv(LAND_PATH, land_usecols, land_dtype))
 
 # --- Step 5: Drop district-level columns and keep state-level only ---
 # Assuming 'district' column represents district-level data and 'state' represents state-wise
@@ -59,8 +86,7 @@ for df in [crop_df, land_df]:
 
 # --- Step 6: Optional: Keep only state, year, and key measures ---
 # (e.g., forests, net_area_sown, etc.)
-key_columns = ["state", "year"] + [c for c in land_df.columns if any(k in c for k in [
-    "forests", "net_area_sown", "cropped_area", "fallow_land", "reporting_area"])]
+key_columns = ["state", "year"] + [c for c in land_df.columns if any(k in c for k in KEY_MEASURES)]
 land_df = land_df[key_columns] if all(k in land_df.columns for k in ["state", "year"]) else land_df
 crop_df = crop_df[key_columns] if all(k in crop_df.columns for k in ["state", "year"]) else crop_df
 
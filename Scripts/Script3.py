@@ -1,9 +1,16 @@
 # --- Step 1: Import libraries ---
-import pandas as pd
+from column_plan import plan_columns, read_planned_csv
+
+CROP_PATH = "/content/cleaned_crop_state_year.csv"
+LAND_PATH = "/content/cleaned_land_state_year.csv"
 
 # --- Step 2: Load the cleaned CSV files ---
-crop_df = pd.read_csv("/content/cleaned_crop_state_year.csv")
-land_df = pd.read_csv("/content/cleaned_land_state_year.csv")
+# Script2 already pruned these to the key columns, so every column is kept;
+# the plan only pins state/year as text (measures keep pandas' inferred dtypes).
+crop_usecols, crop_dtype = plan_columns(CROP_PATH, None, id_columns=["state", "year"])
+land_usecols, land_dtype = plan_columns(LAND_PATH, None, id_columns=["state", "year"])
+crop_df = read_planned_csv(CROP_PATH, crop_usecols, crop_dtype)
+land_df = read_planned_csv(LAND_PATH, land_usecols, land_dtype)
 
 # --- Step 3: Define a function to simplify column names ---
 def rename_columns(df):
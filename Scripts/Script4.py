@@ -2,6 +2,10 @@
 import re
 import pandas as pd
 from pathlib import Path
+from column_plan import (LAND_KEYWORDS, CROP_KEYWORDS, read_header, match_state_column,
+                         find_year_column, select_metric_columns, plan_columns, read_planned_csv)
+from partitioned_store import write_partitioned
+from dashboard_rollups import write_rollups
 
 pd.set_option("display.max_columns", 120)
 
@@ -11,6 +15,7 @@ pd.set_option("display.max_columns", 120)
 LAND_PATH = "/content/renamed_land_data.csv"
 CROP_PATH = "/content/renamed_crop_data.csv"
 OUTPUT_PATH = "/content/final_state_year_land_crop_data.csv"
+OUTPUT_DATASET = "/content/final_state_year_land_crop_data"  # Year=…/State=… parquet partitions
 
 # -----------------------------
 # Helper functions
@@ -18,15 +23,12 @@ OUTPUT_PATH = "/content/final_state_year_land_crop_data.csv"
 def detect_state_column(df):
     """Try common names, otherwise pick best text-like candidate."""
     cols = df.columns.tolist()
-    lowered = [c.lower() for c in cols]
 
     # Common candidates in order
-    candidates = ["state", "state_name", "st_name", "state/ut", "state_ut", "region", "name"]
-    for cand in candidates:
-        for c in cols:
-            if cand == c.lower() or cand in c.lower():
-                print(f"Detected state column by name match: '{c}'")
-                return c
+    c = match_state_column(cols)
+    if c is not None:
+        print(f"Detected state column by name match: '{c}'")
+        return c
 
     # Fallback: choose a non-numeric column with moderate unique count (likely region names)
     nrows = len(df)
@@ -49,21 +51,6 @@ def detect_state_column(df):
     print(f"WARNING: Couldn't confidently detect a state column. Using first column '{cols[0]}' as State.")
     return cols[0]
 
-def collect_year_metric_cols(df):
-    """
-    Return two lists:
-      - cols_with_year: columns that include a 4digit_4digit year token like '2018_2019'
-      - other_cols: columns that don't appear year-prefixed
-    """
-    cols_with_year = []
-    other_cols = []
-    for c in df.columns:
-        if re.search(r'\b(19|20)\d{2}[_-](19|20)\d{2}\b', c):
-            cols_with_year.append(c)
-        else:
-            other_cols.append(c)
-    return cols_with_year, other_cols
-
 def extract_year_from_col(colname):
     # find patterns like 2018_2019 or 2018-2019 or 2018/2019
     m = re.search(r'(19|20)\d{2}[_\-\/](19|20)\d{2}', colname)
@@ -75,16 +62,34 @@ def extract_year_from_col(colname):
         return m2.group(0)
     return None
 
-def metric_keyword_match(colname, keywords):
-    """Return True if any keyword found in colname (case-insensitive)."""
-    ln = colname.lower()
-    return any(k.lower() in ln for k in keywords)
+# -----------------------------
+# Plan reads from headers only
+# -----------------------------
+def plan_domain_columns(path, domain):
+    """
+    Resolve the columns prepare_long_totals will use (state, Year, keyword metrics)
+    from the header alone. If the state column or the metrics can only be found by
+    looking at the data (heuristic fallbacks), every column is kept.
+    """
+    header = read_header(path)
+    state_col = match_state_column(header)
+    year_col = find_year_column(header)
+    keywords = LAND_KEYWORDS if domain == "land" else CROP_KEYWORDS
+    metric_cols = select_metric_columns([c for c in header if c != state_col], keywords)
+    id_cols = [c for c in (state_col, year_col) if c is not None]
+    if state_col is None or not metric_cols:
+        print(f"'{domain}': Can't resolve columns from header alone, reading all columns.")
+        return plan_columns(path, None, id_columns=id_cols, header=header)
+    return plan_columns(path, id_cols + metric_cols, id_columns=id_cols, header=header)
+
+land_usecols, land_dtype = plan_domain_columns(LAND_PATH, "land")
+crop_usecols, crop_dtype = plan_domain_columns(CROP_PATH, "crop")
 
 # -----------------------------
 # Load data
 # -----------------------------
-land_df = pd.read_csv(LAND_PATH, low_memory=False)
-crop_df = pd.read_csv(CROP_PATH, low_memory=False)
+land_df = read_planned_csv(LAND_PATH, land_usecols, land_dtype, low_memory=False)
+crop_df = read_planned_csv(CROP_PATH, crop_usecols, crop_dtype, low_memory=False)
 
 print("Loaded files. Land cols:", len(land_df.columns), " Crop cols:", len(crop_df.columns))
 
@@ -111,11 +116,7 @@ def prepare_long_totals(df, domain="land"):
     """
     df = df.copy()
     # If there's an explicit Year column, normalize name
-    year_col = None
-    for c in df.columns:
-        if c.lower() == "year":
-            year_col = c
-            break
+    year_col = find_year_column(df.columns)
     if year_col:
         df.rename(columns={year_col: "Year"}, inplace=True)
         has_year_col = True
@@ -124,28 +125,12 @@ def prepare_long_totals(df, domain="land"):
         has_year_col = False
         print(f"'{domain}': No explicit Year column found. Will extract years from column headers where possible.")
 
-    # collect columns that include year token
-    with_year, others = collect_year_metric_cols(df)
-
-    # define keywords representing land / crop metrics
-    if domain == "land":
-        keywords = ["reporting_area", "net_area_sown", "reporting_area_for_lus", "forest", "fallow", "culturable", "pasture", "not_available_for_cultivation"]
-    else:
-        # crop domain
-        keywords = ["cropped_area", "production", "yield", "production_total", "area_harvested", "production_of_all_crops"]
+    # keywords representing land / crop metrics (shared with the read planner)
+    keywords = LAND_KEYWORDS if domain == "land" else CROP_KEYWORDS
 
     # Choose columns to treat as metric columns:
-    metric_cols = []
-    # prefer year-prefixed columns that match keywords
-    for c in with_year:
-        if metric_keyword_match(c, keywords):
-            metric_cols.append(c)
-
-    # fallback: if no year-prefixed metric columns found, look in other columns for keywords
-    if not metric_cols:
-        for c in others:
-            if metric_keyword_match(c, keywords):
-                metric_cols.append(c)
+    # prefer year-prefixed columns that match keywords, else other columns that match
+    metric_cols = select_metric_columns(df.columns, keywords)
 
     # If still empty, as last fallback consider numeric columns only (excluding State)
     if not metric_cols:
@@ -238,3 +223,8 @@ print(merged.head(15))
 Path(OUTPUT_PATH).parent.mkdir(parents=True, exist_ok=True)
 merged.to_csv(OUTPUT_PATH, index=False)
 print(f"\n✅ Final merged file written to: {OUTPUT_PATH}")
+
+write_partitioned(merged, OUTPUT_DATASET, mode="overwrite")
+
+# Precompute dashboard rollups (national trends, loss hotspots, YoY, scorecard)
+write_rollups(merged, OUTPUT_PATH)
@@ -1,21 +1,30 @@
 import pandas as pd
+from column_plan import read_header, plan_columns, iter_planned_chunks
+from partitioned_store import PartitionedWriter, split_year_column
 import csv
 
 land_path = "/content/renamed_land_data.csv"
 crop_path = "/content/renamed_crop_data.csv"
 output_path = "/content/final_state_year_land_crop_data.csv"
+dataset_path = "/content/final_state_year_land_crop_data"  # Year=…/State=… parquet partitions
 
 # --- Step 1: Read headers only to find year columns ---
-land_header = pd.read_csv(land_path, nrows=1)
-crop_header = pd.read_csv(crop_path, nrows=1)
+land_header = read_header(land_path)
+crop_header = read_header(crop_path)
 
-state_col_land = land_header.columns[0]
-state_col_crop = crop_header.columns[0]
+state_col_land = land_header[0]
+state_col_crop = crop_header[0]
 
-land_years = [c for c in land_header.columns if any(ch.isdigit() for ch in c)]
-crop_years = [c for c in crop_header.columns if any(ch.isdigit() for ch in c)]
+land_years = [c for c in land_header if any(ch.isdigit() for ch in c)]
+crop_years = [c for c in crop_header if any(ch.isdigit() for ch in c)]
 common_years = sorted(set(land_years) & set(crop_years))
 
+# Only the state column and the common year columns are ever parsed
+land_usecols, land_dtype = plan_columns(land_path, [state_col_land] + common_years, id_columns=[state_col_land],
+                                        header=land_header)
+crop_usecols, crop_dtype = plan_columns(crop_path, [state_col_crop] + common_years, id_columns=[state_col_crop],
+                                        header=crop_header)
+
 print("✅ Common years detected:", common_years[:10], "..." if len(common_years) > 10 else "")
 
 # --- Step 2: Write header for output CSV ---
@@ -26,7 +35,7 @@ with open(output_path, "w", newline="") as f_out:
 # --- Step 3: Build quick lookup for crop data (state → year → production) ---
 crop_lookup = {}
 
-for chunk in pd.read_csv(crop_path, chunksize=50):
+for chunk in iter_planned_chunks(crop_path, crop_usecols, crop_dtype, chunksize=50):
     for _, row in chunk.iterrows():
         state = str(row[state_col_crop]).strip()
         crop_lookup[state] = {}
@@ -38,11 +47,14 @@ for chunk in pd.read_csv(crop_path, chunksize=50):
 
 print("✅ Crop lookup created for", len(crop_lookup), "states")
 
-# --- Step 4: Stream through land data, match crop data, write line-by-line ---
-with open(output_path, "a", newline="") as f_out:
+# --- Step 4: Stream through land data, match crop data, write one batch per chunk ---
+# Each chunk goes to the CSV and to the partitioned dataset as soon as it is built;
+# the dataset writer buffers rows into parquet row groups per Year/State partition.
+with open(output_path, "a", newline="") as f_out, PartitionedWriter(dataset_path, mode="overwrite") as dataset:
     writer = csv.writer(f_out)
 
-    for chunk in pd.read_csv(land_path, chunksize=50):
+    for chunk in iter_planned_chunks(land_path, land_usecols, land_dtype, chunksize=50):
+        row_group = []
         for _, row in chunk.iterrows():
             state = str(row[state_col_land]).strip()
 
@@ -53,6 +65,11 @@ with open(output_path, "a", newline="") as f_out:
                     land_val = 0.0
 
                 crop_val = crop_lookup.get(state, {}).get(year, 0.0)
-                writer.writerow([state, year, land_val, crop_val])
+                row_group.append([state, year, land_val, crop_val])
+
+        writer.writerows(row_group)
+        dataset.write(split_year_column(pd.DataFrame(
+            row_group, columns=["State", "Year", "Total_Land", "Total_Crop_Production"])))
 
 print("\n🎯 Done! File saved as:", output_path)
+print("🎯 Partitioned dataset:", dataset_path)
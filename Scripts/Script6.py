@@ -1,4 +1,6 @@
 import pandas as pd
+from column_plan import read_header, plan_columns, iter_planned_chunks
+from partitioned_store import write_partitioned, split_year_column
 import csv
 import numpy as np
 
@@ -8,21 +10,27 @@ crop_path = "/content/renamed_crop_data.csv"
 output_path = "/content/final_state_year_land_crop_data.csv"
 
 # --- Step 1: Detect columns ---
-land_header = pd.read_csv(land_path, nrows=1)
-crop_header = pd.read_csv(crop_path, nrows=1)
+land_header = read_header(land_path)
+crop_header = read_header(crop_path)
 
-state_col_land = land_header.columns[0]
-state_col_crop = crop_header.columns[0]
+state_col_land = land_header[0]
+state_col_crop = crop_header[0]
 
-land_years = [c for c in land_header.columns if any(ch.isdigit() for ch in c)]
-crop_years = [c for c in crop_header.columns if any(ch.isdigit() for ch in c)]
+land_years = [c for c in land_header if any(ch.isdigit() for ch in c)]
+crop_years = [c for c in crop_header if any(ch.isdigit() for ch in c)]
 common_years = sorted(set(land_years) & set(crop_years))
 
+# Only the state column and the common year columns are ever parsed
+land_usecols, land_dtype = plan_columns(land_path, [state_col_land] + common_years, id_columns=[state_col_land],
+                                        header=land_header)
+crop_usecols, crop_dtype = plan_columns(crop_path, [state_col_crop] + common_years, id_columns=[state_col_crop],
+                                        header=crop_header)
+
 print("✅ Common years found:", common_years[:10], "..." if len(common_years) > 10 else "")
 
 # --- Step 2: Create crop lookup (state → year → value) ---
 crop_lookup = {}
-for chunk in pd.read_csv(crop_path, chunksize=50):
+for chunk in iter_planned_chunks(crop_path, crop_usecols, crop_dtype, chunksize=50):
     for _, row in chunk.iterrows():
         state = str(row[state_col_crop]).strip()
         crop_lookup[state] = {}
@@ -35,7 +43,8 @@ with open(output_path, "w", newline="") as f_out:
     writer = csv.writer(f_out)
     writer.writerow(["State", "Year", "Total_Land", "Total_Crop_Production"])
 
-    for chunk in pd.read_csv(land_path, chunksize=50):
+    for chunk in iter_planned_chunks(land_path, land_usecols, land_dtype, chunksize=50):
+        row_group = []
         for _, row in chunk.iterrows():
             state = str(row[state_col_land]).strip()
 
@@ -47,12 +56,15 @@ with open(output_path, "w", newline="") as f_out:
                 if pd.isna(land_val) or pd.isna(crop_val) or (land_val == 0) or (crop_val == 0):
                     continue
 
-                writer.writerow([state, year, land_val, crop_val])
+                row_group.append([state, year, land_val, crop_val])
+
+        # one buffered write per chunk instead of one per row
+        writer.writerows(row_group)
 
 print("\n✅ Clean merged file saved at:", output_path)
 
 # --- Step 4: Map proper state names if they are numeric codes ---
-df = pd.read_csv(output_path)
+df = pd.read_csv(output_path, dtype={"State": str, "Year": str})
 
 # Example mapping — adjust this to match your dataset
 state_map = {
@@ -95,6 +107,9 @@ df = df[~df["State"].str.contains(r"\d{4}", na=False)]
 # Save cleaned version
 df.to_csv("/content/final_clean_land_crop_data.csv", index=False)
 
+# Same data as Year=…/State=… parquet partitions (dashboards can prune by year/state)
+write_partitioned(split_year_column(df), "/content/final_clean_land_crop_data", mode="overwrite")
+
 print("\n🎯 Final cleaned file ready: /content/final_clean_land_crop_data.csv")
 print("✅ Preview:")
 display(df.head())
@@ -0,0 +1,191 @@
+# Column pruning planner shared by the ETL scripts.
+# Scans a CSV header (plus a small sample of rows) once, resolves which columns a
+# script actually needs, and hands back `usecols` + explicit `dtype` so pandas
+# never parses or allocates the columns we would drop later anyway.
+import re
+import pandas as pd
+
+# -----------------------------
+# Column selection rules
+# -----------------------------
+# Script2: key measures kept next to state/year
+KEY_MEASURES = ["forests", "net_area_sown", "cropped_area", "fallow_land", "reporting_area"]
+
+# Script4 (prepare_long_totals): metric keywords per domain
+LAND_KEYWORDS = ["reporting_area", "net_area_sown", "reporting_area_for_lus", "forest", "fallow", "culturable", "pasture", "not_available_for_cultivation"]
+CROP_KEYWORDS = ["cropped_area", "production", "yield", "production_total", "area_harvested", "production_of_all_crops"]
+
+# Script4 (detect_state_column): common state column names, in order
+STATE_CANDIDATES = ["state", "state_name", "st_name", "state/ut", "state_ut", "region", "name"]
+
+# Number of rows sampled to decide numeric vs text dtypes
+SAMPLE_ROWS = 1000
+
+YEAR_TOKEN = r'\b(19|20)\d{2}[_-](19|20)\d{2}\b'
+# Year anywhere in a name, e.g. '2018_2019_Net_Area_Sown', '2018-2019', '2018/2019'
+YEAR_KEY = r'(19|20)\d{2}[_\-\/](19|20)\d{2}'
+
+
+def read_header(path):
+    """Return the column names of a CSV without reading any data rows."""
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def keyword_match(colname, keywords):
+    """Return True if any keyword found in colname (case-insensitive)."""
+    ln = colname.lower()
+    return any(k.lower() in ln for k in keywords)
+
+
+def match_state_column(columns):
+    """Find the state column by name only (no data needed). Returns None if nothing matches."""
+    for cand in STATE_CANDIDATES:
+        for c in columns:
+            if cand == c.lower() or cand in c.lower():
+                return c
+    return None
+
+
+def find_year_column(columns):
+    """Return the explicit 'Year' column (any case), or None."""
+    for c in columns:
+        if c.lower() == "year":
+            return c
+    return None
+
+
+def select_metric_columns(columns, keywords):
+    """
+    Keyword rule from prepare_long_totals:
+      - prefer year-prefixed columns (e.g. '2018_2019_...') that match a keyword
+      - otherwise fall back to non-year columns that match a keyword
+    Returns [] when nothing matches (caller must then fall back to reading data).
+    """
+    with_year = [c for c in columns if re.search(YEAR_TOKEN, c)]
+    others = [c for c in columns if c not in with_year]
+    metric_cols = [c for c in with_year if keyword_match(c, keywords)]
+    if not metric_cols:
+        metric_cols = [c for c in others if keyword_match(c, keywords)]
+    return metric_cols
+
+
+def year_key(value):
+    """'2018_2019_Net_Area_Sown' / '2018-2019' -> '2018_2019'; other values unchanged."""
+    m = re.search(YEAR_KEY, value)
+    return m.group(0).replace("-", "_").replace("/", "_") if m else value
+
+
+def split_year_metric(colname):
+    """'2018_2019_Net_Area_Sown' -> ('2018_2019', 'Net_Area_Sown'); metric is '' if there is none."""
+    m = re.search(YEAR_KEY, colname)
+    if not m:
+        return colname, ""
+    metric = (colname[:m.start()] + "_" + colname[m.end():]).strip("_")
+    return year_key(colname), metric
+
+
+# -----------------------------
+# Plan + planned readers
+# -----------------------------
+def plan_columns(path, keep, id_columns=(), header=None, sample_rows=SAMPLE_ROWS, pin_numeric=False):
+    """
+    Build the read plan for `path`.
+    keep:        columns to load (header order is preserved); None means all columns
+    id_columns:  text identifiers (State, Year, ...) always read as str
+    header:      the file's columns if the caller already read them (one header scan per file)
+    pin_numeric: also pin the metric columns (float64 if they look numeric in a small
+                 sample, str otherwise). Off by default: float64 changes how integer
+                 values are written back out (1234 -> 1234.0), and the pipeline scripts
+                 all write their values out, so they pin only the id columns.
+    Returns (usecols, dtype).
+    """
+    if header is None:
+        header = read_header(path)
+    keep = set(header if keep is None else keep)
+    usecols = [c for c in header if c in keep]
+
+    dtype = {c: str for c in usecols if c in id_columns}
+    metrics = [c for c in usecols if c not in dtype]
+    if metrics and pin_numeric:
+        sample = pd.read_csv(path, usecols=metrics, nrows=sample_rows, low_memory=False)
+        for c in metrics:
+            values = sample[c].dropna()
+            numeric = pd.to_numeric(values, errors="coerce")
+            dtype[c] = "float64" if numeric.notna().all() else str
+
+    print(f"Read plan for {path}: {len(usecols)} of {len(header)} columns")
+    return usecols, dtype
+
+
+def _relaxed(dtype):
+    """Keep only the text dtypes (used when a sampled float64 guess turns out wrong)."""
+    return {c: t for c, t in dtype.items() if t is str}
+
+
+def read_planned_csv(path, usecols, dtype, **kwargs):
+    """pd.read_csv with the plan applied; retries with text-only dtypes if a numeric guess fails."""
+    try:
+        return pd.read_csv(path, usecols=usecols, dtype=dtype, **kwargs)
+    except ValueError:
+        print(f"WARNING: numeric dtype guess failed for {path}, re-reading with inferred dtypes.")
+        kwargs.setdefault("low_memory", False)
+        return pd.read_csv(path, usecols=usecols, dtype=_relaxed(dtype), **kwargs)
+
+
+def iter_planned_chunks(path, usecols, dtype, chunksize):
+    """
+    Chunked version of read_planned_csv. If a numeric guess fails mid-file, reading
+    resumes from the first unread row with text-only dtypes (no rows repeated or lost).
+    """
+    rows_done = 0
+    current = dtype
+    while True:
+        reader = pd.read_csv(path, usecols=usecols, dtype=current, chunksize=chunksize,
+                             skiprows=range(1, rows_done + 1))
+        try:
+            for chunk in reader:
+                rows_done += len(chunk)
+                yield chunk
+            return
+        except ValueError:
+            if current == _relaxed(dtype):
+                raise
+            print(f"WARNING: numeric dtype guess failed for {path} after {rows_done} rows, continuing with inferred dtypes.")
+            current = _relaxed(dtype)
+        finally:
+            reader.close()
+
+
+# -----------------------------
+# Self-check: python column_plan.py
+# -----------------------------
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    # a column that is numeric for the whole sample and turns into text afterwards
+    rows = SAMPLE_ROWS + 700
+    values = [str(i) for i in range(rows - 1)] + ["abc"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "late_text.csv")
+        pd.DataFrame({"State": ["S"] * rows, "2018_2019_forests": values, "unused": 0}).to_csv(path, index=False)
+
+        usecols, dtype = plan_columns(path, ["State", "2018_2019_forests"], id_columns=["State"], pin_numeric=True)
+        assert usecols == ["State", "2018_2019_forests"], usecols
+        assert dtype == {"State": str, "2018_2019_forests": "float64"}, dtype
+
+        # same call shape as Script4 (extra read_csv kwargs, incl. low_memory)
+        df = read_planned_csv(path, usecols, dtype, low_memory=False)
+        assert len(df) == rows and df["2018_2019_forests"].iloc[-1] == "abc"
+
+        chunks = list(iter_planned_chunks(path, usecols, dtype, chunksize=50))
+        assert sum(len(c) for c in chunks) == rows
+        # earlier chunks hold float64, the rest inferred text: same rows, same order
+        merged = pd.concat(chunks, ignore_index=True)["2018_2019_forests"]
+        assert pd.to_numeric(merged, errors="coerce").iloc[:-1].tolist() == list(range(rows - 1))
+        assert merged.iloc[-1] == "abc"
+
+        # default plan pins only the id columns
+        assert plan_columns(path, None, id_columns=["State"])[1] == {"State": str}
+
+    print("✅ column_plan self-check passed")
@@ -0,0 +1,210 @@
+# Precomputed dashboard rollups + cached query API.
+# Runs after the Script4 / Script7 merge: the State x Year master table is reduced
+# once into small summary tables (one CSV each), so a dashboard refresh reads a
+# few hundred rows instead of re-aggregating the raw data.
+#
+#   build_rollups(df)                  -> {name: DataFrame}
+#   write_rollups(df, master_path)     -> writes <master>_rollups/ + fingerprint
+#   national_trends() / top_loss_states(n) / state_yoy(state) / dependency_scorecard()
+#
+# Queries are served from an LRU cache keyed by the master dataset fingerprint
+# (file size + mtime), so rewriting the master invalidates every cached rollup.
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+import pandas as pd
+from column_plan import year_key
+from partitioned_store import read_partitioned
+
+MASTER_PATH = "/content/final_clean_land_crop_data.csv"
+FINGERPRINT_NAME = "_fingerprint.txt"
+ROLLUP_NAMES = ["national_trends", "state_loss", "state_yoy", "dependency_scorecard"]
+# Measures every rollup needs (an empty partitioned master carries no value columns)
+MEASURE_COLS = ["Total_Land", "Total_Crop_Production"]
+# Bump when the rollup tables change shape so existing rollup dirs get rebuilt
+ROLLUPS_VERSION = 2
+
+
+# -----------------------------
+# Fingerprint
+# -----------------------------
+def dataset_fingerprint(master_path):
+    """
+    Cheap fingerprint of the master dataset: size + mtime of the CSV, or of the
+    _manifest.csv for a partitioned dataset (rewritten on every partition write),
+    plus ROLLUPS_VERSION.
+    """
+    path = Path(master_path)
+    if path.is_dir():
+        path = path / "_manifest.csv"
+    stat = path.stat()
+    key = f"{ROLLUPS_VERSION}:{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def rollups_dir_for(master_path):
+    """
+    Rollups live next to the master, one dir per master:
+    final_x.csv -> final_x_rollups/, partitioned final_x/ -> final_x_dataset_rollups/.
+    """
+    path = Path(master_path)
+    return path.with_name(path.stem + "_rollups") if path.suffix else path.with_name(path.name + "_dataset_rollups")
+
+
+# -----------------------------
+# Rollup computation
+# -----------------------------
+def normalize_years(df):
+    """
+    Collapse the master table to one row per State + Year.
+    Year values like '2018_2019_Net_Area_Sown' (Script5-7 CSVs) are reduced to
+    '2018_2019'; the Metric column of the partitioned datasets is summed over.
+    """
+    df = df.copy()
+    df["Year"] = df["Year"].astype(str).apply(year_key)
+    for c in MEASURE_COLS:
+        if c not in df.columns:
+            df[c] = 0.0
+    value_cols = [c for c in df.columns if c not in ("State", "Year", "Metric")]
+    for c in value_cols:
+        df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
+    return df.groupby(["State", "Year"], as_index=False)[value_cols].sum().sort_values(["State", "Year"])
+
+
+def pct_change(current, previous):
+    """Percent change; NaN instead of +-inf when the previous value is 0."""
+    return (current - previous) / previous.replace(0, float("nan")) * 100
+
+
+def build_rollups(df):
+    """Return {rollup name: small DataFrame} for the State x Year master table."""
+    df = normalize_years(df)
+    value_cols = [c for c in df.columns if c not in ("State", "Year")]
+
+    # Year-wise national totals + YoY deltas (conversion trend dashboard)
+    national = df.groupby("Year", as_index=False)[value_cols].sum().sort_values("Year")
+    for c in value_cols:
+        national[f"{c}_YoY"] = national[c].diff()
+        national[f"{c}_YoY_Pct"] = pct_change(national[c], national[c].shift())
+
+    # State x Year YoY deltas
+    yoy = df.copy()
+    for c in value_cols:
+        yoy[f"{c}_YoY"] = yoy.groupby("State")[c].diff()
+        yoy[f"{c}_YoY_Pct"] = pct_change(yoy[c], yoy.groupby("State")[c].shift())
+
+    # Land loss per state, first year vs latest year (hotspot dashboard).
+    # Only states covering the national span (first to latest year in the data) are
+    # ranked, so hotspot ranks compare like spans; the others are listed unranked.
+    first = df.groupby("State").first()
+    last = df.groupby("State").last()
+    loss = pd.DataFrame({
+        "First_Year": first["Year"],
+        "Last_Year": last["Year"],
+        "First_Land": first["Total_Land"],
+        "Last_Land": last["Total_Land"],
+    })
+    loss["Full_Span"] = (loss["First_Year"] == df["Year"].min()) & (loss["Last_Year"] == df["Year"].max())
+    loss["Land_Loss"] = loss["First_Land"] - loss["Last_Land"]
+    loss["Land_Loss_Pct"] = (loss["Land_Loss"] / loss["First_Land"].replace(0, float("nan"))) * 100
+    loss = loss.sort_values(["Full_Span", "Land_Loss"], ascending=[False, False]).reset_index()
+    loss.insert(0, "Rank", pd.Series(range(1, len(loss) + 1), dtype="Int64").where(loss["Full_Span"]))
+
+    # Dependency scorecard on the latest year in the dataset; states without data
+    # for that year are left out so shares are of one year's national production
+    latest = df[df["Year"] == df["Year"].max()]
+    score = latest[["State", "Year"] + value_cols].copy()
+    national_crop = score["Total_Crop_Production"].sum()
+    score["Production_Per_Land"] = score["Total_Crop_Production"] / score["Total_Land"].replace(0, float("nan"))
+    score["Share_Of_National_Production"] = (score["Total_Crop_Production"] / national_crop * 100) if national_crop else 0.0
+    # Import_Volume is not produced by the merge yet; used as soon as the master carries it
+    if "Import_Volume" in score.columns:
+        supply = score["Import_Volume"] + score["Total_Crop_Production"]
+        score["Import_Dependency"] = score["Import_Volume"] / supply.replace(0, float("nan"))
+        score = score.sort_values("Import_Dependency", ascending=False)
+    else:
+        # no import columns in the master yet: least productive land first
+        score = score.sort_values("Production_Per_Land", ascending=True)
+    score = score.reset_index(drop=True)
+
+    return {
+        "national_trends": national.reset_index(drop=True),
+        "state_loss": loss,
+        "state_yoy": yoy.reset_index(drop=True),
+        "dependency_scorecard": score,
+    }
+
+
+def write_rollups(df, master_path, rollups_dir=None):
+    """Compute the rollups for df (the data in master_path) and save them with its fingerprint."""
+    out_dir = Path(rollups_dir) if rollups_dir else rollups_dir_for(master_path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fingerprint = dataset_fingerprint(master_path)
+    for name, table in build_rollups(df).items():
+        table.to_csv(out_dir / f"{name}.csv", index=False)
+    # fingerprint is written last: a half-written rollup set never looks current
+    (out_dir / FINGERPRINT_NAME).write_text(fingerprint)
+    print(f"✅ Dashboard rollups written to: {out_dir}")
+    return out_dir
+
+
+def _load_master(master_path):
+    path = Path(master_path)
+    if path.is_dir():
+        return read_partitioned(path)
+    return pd.read_csv(path, dtype={"State": str, "Year": str})
+
+
+# -----------------------------
+# Query API
+# -----------------------------
+@lru_cache(maxsize=32)
+def _cached_rollup(rollups_dir, name, fingerprint):
+    # fingerprint is part of the key only: a new master gives a new cache entry
+    return pd.read_csv(Path(rollups_dir) / f"{name}.csv", dtype={"State": str, "Year": str})
+
+
+def get_rollup(name, master_path=MASTER_PATH, rollups_dir=None):
+    """
+    Return a rollup table. Rebuilds the rollups first if the master dataset changed
+    since they were written; repeated queries are answered from memory.
+    """
+    if name not in ROLLUP_NAMES:
+        raise ValueError(f"Unknown rollup '{name}'. Available: {ROLLUP_NAMES}")
+    out_dir = Path(rollups_dir) if rollups_dir else rollups_dir_for(master_path)
+    fingerprint = dataset_fingerprint(master_path)
+
+    stored = out_dir / FINGERPRINT_NAME
+    if not stored.exists() or stored.read_text().strip() != fingerprint:
+        print(f"Rollups for {master_path} are stale, rebuilding...")
+        write_rollups(_load_master(master_path), master_path, out_dir)
+
+    # copy so callers can't mutate the cached table
+    return _cached_rollup(str(out_dir), name, fingerprint).copy()
+
+
+def national_trends(master_path=MASTER_PATH):
+    """National totals per year with YoY deltas."""
+    return get_rollup("national_trends", master_path)
+
+
+def top_loss_states(n=10, master_path=MASTER_PATH):
+    """Top-n states by agricultural land lost over the national span (full-span states only)."""
+    loss = get_rollup("state_loss", master_path)
+    return loss[loss["Full_Span"]].head(n).reset_index(drop=True)
+
+
+def state_yoy(state=None, master_path=MASTER_PATH):
+    """State x Year YoY deltas, optionally for a single state."""
+    yoy = get_rollup("state_yoy", master_path)
+    return yoy[yoy["State"] == state].reset_index(drop=True) if state is not None else yoy
+
+
+def dependency_scorecard(master_path=MASTER_PATH):
+    """Scorecard for the latest year in the dataset (import dependency when import columns exist)."""
+    return get_rollup("dependency_scorecard", master_path)
+
+
+def clear_cache():
+    """Drop every cached rollup (e.g. after editing rollup files by hand)."""
+    _cached_rollup.cache_clear()
@@ -0,0 +1,233 @@
+# Year/State-partitioned dataset writer + pruned reader.
+# Layout (hive style, readable by pandas/pyarrow/Spark/DuckDB as-is):
+#   <root>/Year=2018_2019/State=Andhra%20Pradesh/data.parquet
+#   <root>/_manifest.csv   one row per file: Year, State, path, rows, <col>_min, <col>_max
+# Two write modes:
+#   "overwrite" - the dataset becomes exactly the rows written (pipeline reruns)
+#   "append"    - only the partitions written are replaced, so a new year's data
+#                 lands as new directories and older partitions are never rewritten
+import os
+import shutil
+from pathlib import Path
+from urllib.parse import quote
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from column_plan import split_year_metric
+
+PARTITION_COLS = ["Year", "State"]
+# Always present in the manifest, even for an empty dataset (+ <col>_min/<col>_max)
+MANIFEST_COLS = PARTITION_COLS + ["path", "rows"]
+MANIFEST_NAME = "_manifest.csv"
+FILE_NAME = "data.parquet"
+MODES = ("overwrite", "append")
+
+# Rows buffered before they are flushed as row groups (each row group carries its
+# own min/max in the parquet footer)
+ROW_GROUP_SIZE = 50_000
+
+
+def partition_dir(root, values):
+    """Directory for one partition, e.g. root/Year=2018_2019/State=Goa."""
+    path = Path(root)
+    for col, value in zip(PARTITION_COLS, values):
+        path = path / f"{col}={quote(str(value), safe='')}"
+    return path
+
+
+def read_manifest(root):
+    """Return the manifest of a partitioned dataset (empty, with MANIFEST_COLS, if none yet)."""
+    manifest_path = Path(root) / MANIFEST_NAME
+    try:
+        return pd.read_csv(manifest_path, dtype={c: str for c in PARTITION_COLS + ["path"]})
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        # no dataset yet, or an empty manifest written before MANIFEST_COLS existed
+        return pd.DataFrame(columns=MANIFEST_COLS)
+
+
+class PartitionedWriter:
+    """
+    Streaming writer: write() buffers rows, every ROW_GROUP_SIZE rows the buffer is
+    split by partition and appended as row groups to one open parquet file per
+    partition. Files are written under temporary names and only become visible
+    (with the manifest) on close(), so readers never see a half-written dataset.
+
+        with PartitionedWriter(root, mode="overwrite") as dataset:
+            for chunk in ...:
+                dataset.write(chunk_df)
+    """
+
+    def __init__(self, root, mode="append", row_group_size=ROW_GROUP_SIZE):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}'. Available: {MODES}")
+        self.root = Path(root)
+        self.mode = mode
+        self.row_group_size = row_group_size
+        if mode == "overwrite":
+            # build next to the old dataset, swapped in on close()
+            self.target = self.root.with_name(self.root.name + ".staging")
+            shutil.rmtree(self.target, ignore_errors=True)
+        else:
+            self.target = self.root
+        self.target.mkdir(parents=True, exist_ok=True)
+
+        self.schema = None
+        self.buffer = []
+        self.buffered_rows = 0
+        self.writers = {}   # partition values -> open ParquetWriter
+        self.stats = {}     # partition values -> manifest entry
+
+    def write(self, df):
+        """Buffer the rows of df; flushes a row group once the buffer is full."""
+        if len(df) == 0:
+            return
+        self.buffer.append(df)
+        self.buffered_rows += len(df)
+        if self.buffered_rows >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows as one row group per partition."""
+        if not self.buffer:
+            return
+        df = pd.concat(self.buffer, ignore_index=True)
+        self.buffer, self.buffered_rows = [], 0
+
+        value_cols = [c for c in df.columns if c not in PARTITION_COLS]
+        if self.schema is None:
+            self.schema = pa.Schema.from_pandas(df[value_cols], preserve_index=False)
+        numeric_cols = [f.name for f in self.schema
+                        if pa.types.is_integer(f.type) or pa.types.is_floating(f.type)]
+
+        for values, part in df.groupby(PARTITION_COLS, sort=True):
+            if values not in self.writers:
+                out_dir = partition_dir(self.target, values)
+                out_dir.mkdir(parents=True, exist_ok=True)
+                self.writers[values] = pq.ParquetWriter(out_dir / (FILE_NAME + ".tmp"), self.schema)
+                entry = {col: str(v) for col, v in zip(PARTITION_COLS, values)}
+                entry["path"] = (partition_dir(".", values) / FILE_NAME).as_posix()
+                entry["rows"] = 0
+                self.stats[values] = entry
+
+            table = pa.Table.from_pandas(part[value_cols], schema=self.schema, preserve_index=False)
+            self.writers[values].write_table(table)
+
+            entry = self.stats[values]
+            entry["rows"] += len(part)
+            for c in numeric_cols:
+                low, high = part[c].min(), part[c].max()
+                if pd.notna(low):
+                    entry[f"{c}_min"] = min(low, entry.get(f"{c}_min", low))
+                    entry[f"{c}_max"] = max(high, entry.get(f"{c}_max", high))
+
+    def close(self):
+        """Flush, publish the partition files and write the manifest. Returns the manifest."""
+        self.flush()
+        for values, writer in self.writers.items():
+            writer.close()
+            out_dir = partition_dir(self.target, values)
+            os.replace(out_dir / (FILE_NAME + ".tmp"), out_dir / FILE_NAME)
+
+        new = pd.DataFrame(list(self.stats.values()))
+        new = new.reindex(columns=MANIFEST_COLS + [c for c in new.columns if c not in MANIFEST_COLS])
+        if self.mode == "append":
+            old = read_manifest(self.root)
+            if not old.empty:
+                # keep entries of partitions we did not touch
+                old = old[~old["path"].isin(new["path"])] if not new.empty else old
+                new = pd.concat([old, new], ignore_index=True)
+        if not new.empty:
+            new = new.sort_values(PARTITION_COLS).reset_index(drop=True)
+
+        manifest_path = self.target / MANIFEST_NAME
+        new.to_csv(str(manifest_path) + ".tmp", index=False)
+        os.replace(str(manifest_path) + ".tmp", manifest_path)
+
+        if self.mode == "overwrite":
+            shutil.rmtree(self.root, ignore_errors=True)
+            os.replace(self.target, self.root)
+
+        print(f"✅ Wrote {len(self.stats)} partitions to {self.root} ({len(new)} in dataset, mode={self.mode})")
+        return new
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            # leave the existing dataset untouched
+            for values, writer in self.writers.items():
+                writer.close()
+                (partition_dir(self.target, values) / (FILE_NAME + ".tmp")).unlink(missing_ok=True)
+            if self.mode == "overwrite":
+                shutil.rmtree(self.target, ignore_errors=True)
+        return False
+
+
+def write_partitioned(df, root, mode="append", row_group_size=ROW_GROUP_SIZE):
+    """
+    Write a whole DataFrame as a partitioned dataset (see PartitionedWriter).
+    Use mode="overwrite" for full rebuilds, mode="append" to add/replace partitions.
+    Returns the updated manifest.
+    """
+    with PartitionedWriter(root, mode=mode, row_group_size=row_group_size) as dataset:
+        dataset.write(df)
+    return read_manifest(root)
+
+
+def split_year_column(df):
+    """
+    Script5-7 keep the year-metric column name in Year ('2018_2019_Net_Area_Sown').
+    Split it into a real Year key and a Metric value column before partitioning.
+    """
+    year_metric = df["Year"].astype(str).map(split_year_metric)
+    out = df.copy()
+    out["Year"] = [y for y, _ in year_metric]
+    out.insert(out.columns.get_loc("Year") + 1, "Metric", [m for _, m in year_metric])
+    return out
+
+
+def read_partitioned(root, years=None, states=None, columns=None, ranges=None):
+    """
+    Read only the partitions that can contain matching rows.
+    years / states: lists of partition values to keep (None = all)
+    columns:        value columns to load (None = all)
+    ranges:         {column: (low, high)}; files whose manifest min/max cannot
+                    overlap the range are skipped, remaining rows are filtered
+    Returns a DataFrame with the partition columns restored.
+    """
+    root = Path(root)
+    manifest = read_manifest(root)
+    if manifest.empty:
+        return pd.DataFrame(columns=PARTITION_COLS + list(columns or []))
+
+    keep = pd.Series(True, index=manifest.index)
+    if years is not None:
+        keep &= manifest["Year"].isin([str(y) for y in years])
+    if states is not None:
+        keep &= manifest["State"].isin([str(s) for s in states])
+    for col, (low, high) in (ranges or {}).items():
+        if f"{col}_min" in manifest.columns:
+            keep &= ~((manifest[f"{col}_max"] < low) | (manifest[f"{col}_min"] > high))
+
+    load_cols = None
+    if columns is not None:
+        load_cols = list(dict.fromkeys(list(columns) + list((ranges or {}).keys())))
+
+    frames = []
+    for _, entry in manifest[keep].iterrows():
+        part = pd.read_parquet(root / entry["path"], engine="pyarrow", columns=load_cols)
+        for i, col in enumerate(PARTITION_COLS):
+            part.insert(i, col, entry[col])
+        frames.append(part)
+    if not frames:
+        return pd.DataFrame(columns=PARTITION_COLS + list(columns or []))
+
+    df = pd.concat(frames, ignore_index=True)
+    for col, (low, high) in (ranges or {}).items():
+        df = df[df[col].between(low, high)]
+    if columns is not None:
+        df = df[PARTITION_COLS + list(columns)]
+    return df.reset_index(drop=True)